@@ -6,10 +6,13 @@ relative path in a target directory tree.
 
 import os
 import sys
+import getpass
 import pwd
+import stat
 import argparse
 import logging
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 DEFAULT_SOURCE_ROOT = "/glade/campaign/cesm/cesmdata/cseg/inputdata/"
@@ -47,16 +50,22 @@ def _handle_non_dir_entry(entry: os.DirEntry, user_uid: int):
         str or None: The absolute path to the file if it's owned by the user
                      and is a regular file (not a symlink), otherwise None.
     """
-    # Is this even owned by the user?
-    if entry.stat(follow_symlinks=False).st_uid == user_uid:
-
-        # Return if it's a file (not following symlinks)
-        if entry.is_file(follow_symlinks=False):
-            return entry.path
-
-        # Log about skipping symlinks
-        if entry.is_symlink():
+    # Symlinks are always skipped. Their type usually comes for free from scandir, so only stat
+    # them if we'd actually log about skipping one of the user's symlinks.
+    if entry.is_symlink():
+        if (
+            logger.isEnabledFor(logging.DEBUG)
+            and entry.stat(follow_symlinks=False).st_uid == user_uid
+        ):
             logger.debug("Skipping symlink: %s", entry.path)
+        return None
+
+    # Return if it's a file (not following symlinks) owned by the user
+    if (
+        entry.is_file(follow_symlinks=False)
+        and entry.stat(follow_symlinks=False).st_uid == user_uid
+    ):
+        return entry.path
 
     return None
 
@@ -76,18 +85,18 @@ def _handle_non_dir_str(path: str, user_uid: int):
         str or None: The absolute path to the file if it's owned by the user
                      and is a regular file (not a symlink), otherwise None.
     """
-    # Is this even owned by the user?
-    if os.stat(path, follow_symlinks=False).st_uid == user_uid:
+    # One lstat gives both the owner and the file type
+    path_stat = os.stat(path, follow_symlinks=False)
 
-        is_file = os.path.isfile(path)
-        is_symlink = os.path.islink(path)
+    # Is this even owned by the user?
+    if path_stat.st_uid == user_uid:
 
         # Log about skipping symlinks
-        if is_symlink:
+        if stat.S_ISLNK(path_stat.st_mode):
             logger.debug("Skipping symlink: %s", path)
 
         # Return if it's a file (and not a symlink)
-        elif is_file:
+        elif stat.S_ISREG(path_stat.st_mode):
             return path
 
     return None
@@ -149,36 +158,45 @@ def find_owned_files_scandir(item, user_uid, inputdata_root=DEFAULT_SOURCE_ROOT)
     Raises:
         ValueError: If any file found is not under inputdata_root.
     """
-    try:
-        with os.scandir(item) as entries:
-            for entry in entries:
-                try:
-                    # Recursively process directories (not following symlinks)
-                    if entry.is_dir(follow_symlinks=False):
-                        yield from find_owned_files_scandir(
-                            entry.path, user_uid, inputdata_root
-                        )
-
-                    # Things other than directories are handled separately
-                    elif (
-                        entry_path := handle_non_dir(entry, user_uid)
-                    ) is not None:
-                        yield entry_path
-
-                except (OSError, PermissionError) as e:
-                    logger.error("Error accessing %s: %s. Skipping.", entry.path, e)
-                    continue
-
-    except NotADirectoryError:
-        if (file_path := handle_non_dir(item, user_uid)) is not None:
-            yield file_path
-
-    except (OSError, PermissionError) as e:
-        logger.error("Error accessing %s: %s. Skipping.", item, e)
+    # Directories still to be searched. Keeping our own stack instead of recursing means deep trees
+    # don't need a chain of nested generators, each of which every result would pass through.
+    dirs_to_search = [item]
+    while dirs_to_search:
+        directory = dirs_to_search.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        # Queue up directories (not following symlinks) to search later
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs_to_search.append(entry.path)
+
+                        # Things other than directories are handled separately
+                        elif (
+                            entry_path := handle_non_dir(entry, user_uid)
+                        ) is not None:
+                            yield entry_path
+
+                    except (OSError, PermissionError) as e:
+                        logger.error("Error accessing %s: %s. Skipping.", entry.path, e)
+                        continue
+
+        # Only expected for the original item, if it's a file
+        except NotADirectoryError:
+            if (file_path := handle_non_dir(directory, user_uid)) is not None:
+                yield file_path
+
+        except (OSError, PermissionError) as e:
+            logger.error("Error accessing %s: %s. Skipping.", directory, e)
 
 
 def replace_files_with_symlinks(
-    item_to_process, target_dir, username, inputdata_root=DEFAULT_SOURCE_ROOT, dry_run=False
+    item_to_process,
+    target_dir,
+    username,
+    inputdata_root=DEFAULT_SOURCE_ROOT,
+    dry_run=False,
+    jobs=1,
 ):
     """
     Finds files owned by a specific user in a source directory tree,
@@ -191,6 +209,8 @@ def replace_files_with_symlinks(
         inputdata_root (str): The root of the directory tree containing CESM input data.
         username (str): The name of the user whose files will be processed.
         dry_run (bool): If True, only show what would be done without making changes.
+        jobs (int): Number of threads to use for replacing files. Replacement is dominated by
+                    filesystem latency, so on network filesystems more than one can help.
     """
     item_to_process = os.path.abspath(item_to_process)
     target_dir = os.path.abspath(target_dir)
@@ -213,8 +233,36 @@ def replace_files_with_symlinks(
     )
 
     # Use efficient scandir-based search
-    for file_path in find_owned_files_scandir(item_to_process, user_uid, inputdata_root):
-        replace_one_file_with_symlink(inputdata_root, target_dir, file_path, dry_run=dry_run)
+    owned_files = find_owned_files_scandir(item_to_process, user_uid, inputdata_root)
+
+    if jobs <= 1:
+        for file_path in owned_files:
+            replace_one_file_with_symlink(inputdata_root, target_dir, file_path, dry_run=dry_run)
+        return
+
+    # Each file is replaced independently, so the traversal can keep going while worker threads
+    # do the replacing. Only a few files per thread are queued at a time, though, so that memory
+    # doesn't grow with the size of the tree and errors from the workers surface promptly.
+    max_pending = jobs * 4
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = set()
+        for file_path in owned_files:
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                # Re-raise anything unexpected from the workers
+                for future in done:
+                    future.result()
+            pending.add(
+                pool.submit(
+                    replace_one_file_with_symlink,
+                    inputdata_root,
+                    target_dir,
+                    file_path,
+                    dry_run=dry_run,
+                )
+            )
+        for future in pending:
+            future.result()
 
 
 def replace_one_file_with_symlink(
@@ -232,9 +280,18 @@ def replace_one_file_with_symlink(
     """
     logger.info("Found owned file: %s", file_path)
 
-    # Determine the relative path and the new link's destination
-    relative_path = os.path.relpath(file_path, inputdata_root)
-    link_target = os.path.join(target_dir, relative_path)
+    # Determine the relative path and the new link's destination. file_path will nearly always be
+    # an absolute path under inputdata_root, in which case slicing off the root is much cheaper
+    # than os.path.relpath().
+    # The remainder is already a clean relative path, so plain concatenation can stand in for
+    # os.path.join() too.
+    root_prefix = inputdata_root.rstrip(os.sep) + os.sep
+    if file_path.startswith(root_prefix):
+        relative_path = file_path[len(root_prefix) :]
+        link_target = target_dir.rstrip(os.sep) + os.sep + relative_path
+    else:
+        relative_path = os.path.relpath(file_path, inputdata_root)
+        link_target = os.path.join(target_dir, relative_path)
 
     # Check if the target file actually exists
     if not os.path.exists(link_target):
@@ -256,24 +313,40 @@ def replace_one_file_with_symlink(
         )
         return
 
-    # Remove the original file
+    # Create the symbolic link under a temporary name next to the original file
+    tmp_link_name = link_name + ".relink.tmp"
     try:
-        os.rename(link_name, link_name + ".tmp")
-        logger.info("Deleted original file: %s", link_name)
+        try:
+            os.symlink(link_target, tmp_link_name)
+        except FileExistsError:
+            # Most likely left behind by an earlier run that was killed partway through. Only
+            # clear it away if it's a symlink, though; anything else isn't ours to delete.
+            if not os.path.islink(tmp_link_name):
+                raise
+            logger.warning("Removing stale temporary link %s", tmp_link_name)
+            os.remove(tmp_link_name)
+            os.symlink(link_target, tmp_link_name)
     except OSError as e:
-        logger.error("Error deleting file %s: %s. Skipping.", link_name, e)
+        logger.error("Error creating symlink for %s: %s. Skipping.", link_name, e)
         return
 
-    # Create the symbolic link, handling necessary parent directories
+    # Move the link over the original file. This replaces it atomically, so there's never a
+    # moment where nothing exists at link_name.
     try:
-        # Create parent directories for the link if they don't exist
-        os.makedirs(os.path.dirname(link_name), exist_ok=True)
-        os.symlink(link_target, link_name)
-        os.remove(link_name + ".tmp")
-        logger.info("Created symbolic link: %s -> %s", link_name, link_target)
+        os.replace(tmp_link_name, link_name)
     except OSError as e:
-        os.rename(link_name + ".tmp", link_name)
-        logger.error("Error creating symlink for %s: %s. Skipping.", link_name, e)
+        logger.error("Error replacing %s with symlink: %s. Skipping.", link_name, e)
+        try:
+            os.remove(tmp_link_name)
+        except OSError as cleanup_error:
+            logger.error(
+                "Error removing temporary link %s: %s. It was left behind.",
+                tmp_link_name,
+                cleanup_error,
+            )
+        return
+    logger.info("Deleted original file: %s", link_name)
+    logger.info("Created symbolic link: %s -> %s", link_name, link_target)
 
 
 def validate_paths(path, check_is_dir=False):
@@ -318,6 +391,28 @@ def validate_directory(path):
     return validate_paths(path, check_is_dir=True)
 
 
+def validate_jobs(value):
+    """
+    Validate that the number of jobs is a positive integer.
+
+    Args:
+        value (str): The number of jobs, as given on the command line.
+
+    Returns:
+        int: The number of jobs.
+
+    Raises:
+        argparse.ArgumentTypeError: If value isn't a positive integer.
+    """
+    try:
+        jobs = int(value)
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a positive integer")
+    return jobs
+
+
 def parse_arguments():
     """
     Parse command-line arguments.
@@ -382,6 +477,16 @@ def parse_arguments():
         action="store_true",
         help="Measure and display the execution time",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=validate_jobs,
+        default=1,
+        help=(
+            "Number of threads to use for replacing files. More than 1 can help on filesystems "
+            "with high latency (default: 1)"
+        ),
+    )
 
     args = parser.parse_args()
 
@@ -436,6 +541,17 @@ def process_args(args):
             )
 
 
+def log_execution_time(start_time):
+    """
+    Log how much time has passed since start_time, regardless of log level.
+
+    Args:
+        start_time (float): The start time, as returned by time.perf_counter().
+    """
+    elapsed_time = time.perf_counter() - start_time
+    logger.always("Execution time: %.2f seconds", elapsed_time)
+
+
 def main():
     # pylint: disable=missing-function-docstring
 
@@ -443,9 +559,11 @@ def main():
 
     logging.basicConfig(level=args.log_level, format="%(message)s", stream=sys.stdout)
 
-    my_username = os.environ["USER"]
+    # $USER isn't always set (e.g., under cron or some batch systems), so don't rely on it alone.
+    # getpass.getuser() checks $LOGNAME, then $USER, then falls back to the password database.
+    my_username = getpass.getuser()
 
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # --- Execution ---
     for item in args.items_to_process:
@@ -455,11 +573,11 @@ def main():
             my_username,
             inputdata_root=args.inputdata_root,
             dry_run=args.dry_run,
+            jobs=args.jobs,
         )
 
     if args.timing:
-        elapsed_time = time.time() - start_time
-        logger.always("Execution time: %.2f seconds", elapsed_time)
+        log_execution_time(start_time)
 
 
 if __name__ == "__main__":
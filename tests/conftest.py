@@ -2,12 +2,132 @@
 Pytest configuration and shared fixtures for relink tests.
 """
 
+import glob
+import hashlib
 import os
+import sys
+from pathlib import Path
 
 import pytest
 
+# Cache entry for the opt-in, dev-only --skip-unchanged mode. These hooks live here rather than in
+# relink/conftest.py because, under pytest-xdist, the controller process only loads this one.
+CACHE_KEY = "relink/last_green"
+
+# The repo's top-level directory, and the directory holding the relink tests
+_REPO_ROOT = str(Path(__file__).resolve().parents[1])
+_TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "relink")
+
+# pytest's rootdir, which test report locations are relative to. Set in pytest_configure().
+_rootpath = None
+
+# Node IDs of relink tests that passed in this session
+_passed_this_session = set()
+
+
+def _source_hash():
+    """
+    Hash relink.py, the relink test sources (including their conftest and package __init__), and
+    the shared test setup here, so that changing any of them invalidates the cache. The Python and
+    pytest versions go in too, so that switching interpreters doesn't skip tests.
+    """
+    paths = [os.path.join(_REPO_ROOT, "relink.py")]
+    paths += sorted(glob.glob(os.path.join(_TEST_DIR, "*.py")))
+    paths += sorted(glob.glob(os.path.join(os.path.dirname(_TEST_DIR), "*.py")))
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(sys.version.encode("utf-8"))
+    hasher.update(pytest.__version__.encode("utf-8"))
+    for path in paths:
+        with open(path, "rb") as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()
+
+
+def _is_relink_test(path):
+    """
+    Whether a test file is one of the relink tests. Goes by location on disk rather than node ID,
+    since node IDs are relative to pytest's rootdir and so depend on where pytest was run from.
+    """
+    return os.path.abspath(path).startswith(_TEST_DIR + os.sep)
+
+
+def _is_xdist_worker(config):
+    """
+    Whether this is a pytest-xdist worker process, rather than the controller or a plain run.
+    """
+    return hasattr(config, "workerinput")
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    If requested, skip relink tests that passed in a previous run against the same sources.
+    """
+    if not config.getoption("skip_unchanged", False):
+        return
+    last_green = config.cache.get(CACHE_KEY, None)
+    if not last_green or last_green["hash"] != _source_hash():
+        return
+    already_passed = set(last_green["passed"])
+    skip = pytest.mark.skip(reason="relink unchanged since this test last passed")
+    for item in items:
+        if item.nodeid in already_passed:
+            item.add_marker(skip)
+
+
+def pytest_runtest_logreport(report):
+    """
+    Keep track of which relink tests passed. Under pytest-xdist, this also runs on the controller
+    for the reports that the workers send back, even though the controller collects nothing, so
+    relink tests are recognized by their file rather than by anything noted at collection.
+    """
+    if report.when != "call" or not report.passed:
+        return
+    if _is_relink_test(os.path.join(_rootpath, report.fspath)):
+        _passed_this_session.add(report.nodeid)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """
+    If everything passed, record which relink tests passed against the current sources.
+    """
+    # Under pytest-xdist, only the controller sees every worker's results, so only it records
+    # them. Otherwise, workers would each overwrite the record with just their own share. (Also,
+    # there's no cache at all if pytest was run with -p no:cacheprovider.)
+    if _is_xdist_worker(session.config) or not hasattr(session.config, "cache"):
+        return
+    if exitstatus != 0 or not _passed_this_session:
+        return
+    current_hash = _source_hash()
+    passed = set(_passed_this_session)
+    last_green = session.config.cache.get(CACHE_KEY, None)
+    if last_green and last_green["hash"] == current_hash:
+        passed.update(last_green["passed"])
+    session.config.cache.set(CACHE_KEY, {"hash": current_hash, "passed": sorted(passed)})
+
+
+def pytest_addoption(parser):
+    """Register custom command-line options."""
+    parser.addoption(
+        "--skip-unchanged",
+        action="store_true",
+        default=False,
+        help="skip relink tests that already passed against the current relink.py and tests",
+    )
+
+
+def pytest_configure(config):
+    """
+    Register custom markers, and remember pytest's rootdir for finding test files from their
+    reports.
+    """
+    global _rootpath  # pylint: disable=global-statement
+    _rootpath = str(config.rootpath)
+    config.addinivalue_line(
+        "markers", "slow: slow tests (e.g., ones that spawn a subprocess); skip with -m 'not slow'"
+    )
+
 
 @pytest.fixture(scope="session")
 def workspace_root():
     """Return the root directory of the workspace."""
-    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return str(Path(__file__).resolve().parents[1])
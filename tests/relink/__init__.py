@@ -0,0 +1,52 @@
+"""Tests of relink.py."""
+
+import os
+import sys
+from pathlib import Path
+
+# The repo's top-level directory, computed once for all test modules
+REPO_ROOT = str(Path(__file__).resolve().parents[2])
+
+# Add it to the path (just once, however many test modules there are) so that the test modules
+# can import relink.
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+# Log messages (or the start of them) that the tests check for
+MSG_SEARCHING = "Searching for files owned by"
+MSG_SKIPPING_SYMLINK = "Skipping symlink:"
+MSG_FOUND_OWNED = "Found owned file:"
+MSG_DELETED = "Deleted original file:"
+MSG_CREATED = "Created symbolic link:"
+MSG_TARGET_MISSING = "Warning: Corresponding file"
+MSG_NOT_FOUND = "not found"
+MSG_USER_NOT_FOUND = "Error: User"
+MSG_ERROR_ACCESSING = "Error accessing"
+MSG_ERROR_REPLACING = "Error replacing"
+MSG_ERROR_SYMLINK = "Error creating symlink"
+MSG_ERROR_REMOVING_TMP = "Error removing temporary link"
+MSG_STALE_TMP = "Removing stale temporary link"
+MSG_DRY_RUN_MODE = "DRY RUN MODE"
+MSG_WOULD_CREATE = "[DRY RUN] Would create symbolic link: "
+MSG_EXECUTION_TIME = "Execution time:"
+
+
+def make_file(path, data=b"content"):
+    """
+    Create a file with the given contents, writing them with a single low-level os.write() call
+    rather than going through the buffered text I/O layer that open() sets up.
+
+    Args:
+        path (str): The path of the file to create.
+        data (bytes): The contents to write.
+
+    Returns:
+        str: The path of the file.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    return path
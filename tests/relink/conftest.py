@@ -2,31 +2,90 @@
 Shared fixtures for relink tests.
 """
 
+import getpass
 import os
-import tempfile
-import shutil
+import pwd
 
 import pytest
 from unittest.mock import patch
 
+from . import make_file
+
 
 @pytest.fixture(scope="function", name="temp_dirs")
-def fixture_temp_dirs():
-    """Create temporary source and target directories for testing."""
-    source_dir = tempfile.mkdtemp(prefix="test_source_")
-    target_dir = tempfile.mkdtemp(prefix="test_target_")
+def fixture_temp_dirs(tmp_path_factory):
+    """
+    Create temporary source and target directories for testing. They're left for pytest to clean
+    up along with the rest of its old temporary directories.
+    """
+    source_dir = str(tmp_path_factory.mktemp("test_source_"))
+    target_dir = str(tmp_path_factory.mktemp("test_target_"))
+
+    with patch.multiple(
+        "relink", DEFAULT_SOURCE_ROOT=source_dir, DEFAULT_TARGET_ROOT=target_dir
+    ):
+        yield source_dir, target_dir
+
+
+@pytest.fixture(name="make_pair")
+def fixture_make_pair(temp_dirs):
+    """
+    Fixture providing a function that creates a file in the temporary source directory and its
+    counterpart in the temporary target directory, along with any missing parent directories.
+
+    Returns:
+        callable: Takes the path relative to both roots, plus optional contents (bytes) for the
+                  source and target files, and returns the (source_file, target_file) paths.
+    """
+    source_dir, target_dir = temp_dirs
+
+    def make_pair(rel_path, source_content=b"source content", target_content=b"target content"):
+        source_file = os.path.join(source_dir, rel_path)
+        target_file = os.path.join(target_dir, rel_path)
+        for path, content in ((source_file, source_content), (target_file, target_content)):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            make_file(path, content)
+        return source_file, target_file
+
+    return make_pair
 
-    with patch("relink.DEFAULT_SOURCE_ROOT", source_dir):
-        with patch("relink.DEFAULT_TARGET_ROOT", target_dir):
-            yield source_dir, target_dir
 
-    # Cleanup
-    shutil.rmtree(source_dir, ignore_errors=True)
-    shutil.rmtree(target_dir, ignore_errors=True)
+@pytest.fixture(name="logged")
+def fixture_logged(caplog):
+    """
+    Fixture providing a function that checks whether any captured log message contains a given
+    substring. Unlike checking caplog.text, this doesn't format and join every record on each call.
 
+    Returns:
+        callable: Takes a substring and returns True if any captured message contains it.
+    """
 
-@pytest.fixture(name="current_user")
+    def logged(substr):
+        return any(substr in r.getMessage() for r in caplog.records)
+
+    return logged
+
+
+@pytest.fixture(scope="session", name="known_missing_user")
+def fixture_known_missing_user():
+    """
+    A username that doesn't exist on this system. The check that it really doesn't exist can be
+    slow on systems where user lookups go over the network, so it's only done once per session.
+    """
+    username = "nonexistent_user_12345"
+    try:
+        pwd.getpwnam(username)
+    except KeyError:
+        return username
+    # Fail loudly rather than skip: a skip would quietly drop every check in the tests using this
+    raise RuntimeError(f"{username=} DOES actually exist")
+
+
+@pytest.fixture(scope="session", name="current_user")
 def fixture_current_user():
-    """Get the current user's username."""
-    username = os.environ["USER"]
-    return username
+    """
+    Get the current user's username, the same way relink.main() does. Unlike reading $USER,
+    getpass.getuser() falls back to the password database if the environment doesn't say.
+    """
+    return getpass.getuser()
+
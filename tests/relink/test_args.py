@@ -3,7 +3,6 @@ Tests related to argument parsing and processing in relink.py script.
 """
 
 import os
-import sys
 from pathlib import Path
 import logging
 import argparse
@@ -11,12 +10,11 @@ from unittest.mock import patch
 
 import pytest
 
-# Add parent directory to path to import relink module
-sys.path.insert(
-    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-)
-# pylint: disable=wrong-import-position
-import relink  # noqa: E402
+import relink
+
+
+# A path that should never exist
+_NONEXISTENT = os.path.join(os.sep, "nonexistent", "directory", "12345")
 
 
 class TestParseArguments:
@@ -37,7 +35,7 @@ class TestParseArguments:
         custom_source.mkdir()
         with patch("sys.argv", ["relink.py", str(custom_source)]):
             args = relink.parse_arguments()
-            assert args.items_to_process == [str(custom_source.resolve())]
+            assert args.items_to_process == [str(custom_source)]
             assert args.target_root == target_dir
 
     def test_custom_target_root(self, temp_dirs):
@@ -48,7 +46,7 @@ class TestParseArguments:
         with patch("sys.argv", ["relink.py", "--target-root", str(custom_target)]):
             args = relink.parse_arguments()
             assert args.items_to_process == [source_dir]
-            assert args.target_root == str(custom_target.resolve())
+            assert args.target_root == str(custom_target)
 
     def test_both_custom_paths(self, temp_dirs):
         """Test both custom source and target roots."""
@@ -67,88 +65,60 @@ class TestParseArguments:
             ],
         ):
             args = relink.parse_arguments()
-            assert args.items_to_process == [str(source_dir.resolve())]
-            assert args.target_root == str(target_dir.resolve())
-
-    def test_verbose_flag(self, temp_dirs):  # pylint: disable=unused-argument
-        """Test that --verbose flag is parsed correctly."""
-        with patch("sys.argv", ["relink.py", "--verbose"]):
-            args = relink.parse_arguments()
-            assert args.verbose is True
-            assert args.quiet is False
-
-    def test_quiet_flag(self, temp_dirs):  # pylint: disable=unused-argument
-        """Test that --quiet flag is parsed correctly."""
-        with patch("sys.argv", ["relink.py", "--quiet"]):
-            args = relink.parse_arguments()
-            assert args.quiet is True
-            assert args.verbose is False
-
-    def test_verbose_short_flag(self, temp_dirs):  # pylint: disable=unused-argument
-        """Test that -v flag is parsed correctly."""
-        with patch("sys.argv", ["relink.py", "-v"]):
-            args = relink.parse_arguments()
-            assert args.verbose is True
-
-    def test_quiet_short_flag(self, temp_dirs):  # pylint: disable=unused-argument
-        """Test that -q flag is parsed correctly."""
-        with patch("sys.argv", ["relink.py", "-q"]):
-            args = relink.parse_arguments()
-            assert args.quiet is True
-
-    def test_default_verbosity(self, temp_dirs):  # pylint: disable=unused-argument
-        """Test that default verbosity has both flags as False."""
-        with patch("sys.argv", ["relink.py"]):
+            assert args.items_to_process == [str(source_dir)]
+            assert args.target_root == str(target_dir)
+
+    @pytest.mark.parametrize(
+        "flags, expected",
+        [
+            (["--verbose"], {"verbose": True, "quiet": False}),
+            (["-v"], {"verbose": True, "quiet": False}),
+            (["--quiet"], {"quiet": True, "verbose": False}),
+            (["-q"], {"quiet": True, "verbose": False}),
+            (["--dry-run"], {"dry_run": True}),
+            (["--timing"], {"timing": True}),
+            ([], {"verbose": False, "quiet": False, "dry_run": False, "timing": False}),
+        ],
+        ids=["verbose", "verbose_short", "quiet", "quiet_short", "dry_run", "timing", "defaults"],
+    )
+    def test_flags(self, temp_dirs, flags, expected):  # pylint: disable=unused-argument
+        """Test that flags are parsed correctly, and that they all default to False."""
+        with patch("sys.argv", ["relink.py"] + flags):
             args = relink.parse_arguments()
-            assert args.verbose is False
-            assert args.quiet is False
+        for attr, value in expected.items():
+            assert getattr(args, attr) is value, attr
 
-    def test_verbose_and_quiet_mutually_exclusive(self, temp_dirs):
+    @pytest.mark.parametrize(
+        "flags", [["--verbose", "--quiet"], ["-v", "-q"]], ids=["long", "short"]
+    )
+    def test_verbose_and_quiet_mutually_exclusive(self, temp_dirs, flags):
         """Test that --verbose and --quiet cannot be used together."""
         # pylint: disable=unused-argument
-        with patch("sys.argv", ["relink.py", "--verbose", "--quiet"]):
+        with patch("sys.argv", ["relink.py"] + flags):
             with pytest.raises(SystemExit) as exc_info:
                 relink.parse_arguments()
             # Mutually exclusive arguments cause SystemExit with code 2
             assert exc_info.value.code == 2
 
-    def test_verbose_and_quiet_short_flags_mutually_exclusive(self, temp_dirs):
-        """Test that -v and -q cannot be used together."""
-        # pylint: disable=unused-argument
-        with patch("sys.argv", ["relink.py", "-v", "-q"]):
+    @pytest.mark.parametrize(
+        "flags, expected",
+        [([], 1), (["--jobs", "4"], 4), (["-j", "8"], 8)],
+        ids=["default", "long", "short"],
+    )
+    def test_jobs(self, temp_dirs, flags, expected):  # pylint: disable=unused-argument
+        """Test that --jobs is parsed correctly and defaults to 1."""
+        with patch("sys.argv", ["relink.py"] + flags):
+            args = relink.parse_arguments()
+        assert args.jobs == expected
+
+    @pytest.mark.parametrize("value", ["0", "-2", "two"])
+    def test_jobs_invalid(self, temp_dirs, value):  # pylint: disable=unused-argument
+        """Test that --jobs must be a positive integer."""
+        with patch("sys.argv", ["relink.py", "--jobs", value]):
             with pytest.raises(SystemExit) as exc_info:
                 relink.parse_arguments()
-            # Mutually exclusive arguments cause SystemExit with code 2
             assert exc_info.value.code == 2
 
-    def test_dry_run_flag(self, temp_dirs):
-        """Test that --dry-run flag is parsed correctly."""
-        # pylint: disable=unused-argument
-        with patch("sys.argv", ["relink.py", "--dry-run"]):
-            args = relink.parse_arguments()
-            assert args.dry_run is True
-
-    def test_dry_run_default(self, temp_dirs):
-        """Test that dry_run defaults to False."""
-        # pylint: disable=unused-argument
-        with patch("sys.argv", ["relink.py"]):
-            args = relink.parse_arguments()
-            assert args.dry_run is False
-
-    def test_timing_flag(self, temp_dirs):
-        """Test that --timing flag is parsed correctly."""
-        # pylint: disable=unused-argument
-        with patch("sys.argv", ["relink.py", "--timing"]):
-            args = relink.parse_arguments()
-            assert args.timing is True
-
-    def test_timing_default(self, temp_dirs):
-        """Test that timing defaults to False."""
-        # pylint: disable=unused-argument
-        with patch("sys.argv", ["relink.py"]):
-            args = relink.parse_arguments()
-            assert args.timing is False
-
     def test_multiple_source_roots(self, temp_dirs):
         """Test that multiple source root arguments are parsed correctly."""
         inputdata_root, target_dir = temp_dirs
@@ -162,9 +132,9 @@ class TestParseArguments:
         with patch("sys.argv", ["relink.py", str(source1), str(source2), str(source3)]):
             args = relink.parse_arguments()
             assert len(args.items_to_process) == 3
-            assert str(source1.resolve()) in args.items_to_process
-            assert str(source2.resolve()) in args.items_to_process
-            assert str(source3.resolve()) in args.items_to_process
+            assert str(source1) in args.items_to_process
+            assert str(source2) in args.items_to_process
+            assert str(source3) in args.items_to_process
             assert args.target_root == target_dir
 
     def test_multiple_source_roots_with_target(self, temp_dirs):
@@ -189,147 +159,88 @@ class TestParseArguments:
         ):
             args = relink.parse_arguments()
             assert len(args.items_to_process) == 2
-            assert str(source1.resolve()) in args.items_to_process
-            assert str(source2.resolve()) in args.items_to_process
-            assert args.target_root == str(target.resolve())
+            assert str(source1) in args.items_to_process
+            assert str(source2) in args.items_to_process
+            assert args.target_root == str(target)
 
 
-class TestValidateDirectory:
-    """Test suite for validate_directory function."""
+@pytest.mark.parametrize(
+    "validate_fn",
+    [relink.validate_directory, relink.validate_paths],
+    ids=["validate_directory", "validate_paths"],
+)
+class TestValidateDirectoryAndPaths:
+    """
+    Test suite for behavior that validate_directory and validate_paths share, i.e., when given
+    directories.
+    """
 
-    def test_valid_directory(self, tmp_path):
+    def test_valid_directory(self, validate_fn, tmp_path):
         """Test that valid directory is accepted and returns absolute path."""
-        test_dir = tmp_path / "valid_dir"
-        test_dir.mkdir()
-
-        result = relink.validate_directory(str(test_dir))
-        assert result == str(test_dir.resolve())
+        # tmp_path is already a unique, absolute directory for this test
+        result = validate_fn(str(tmp_path))
+        assert result == str(tmp_path)
 
-    def test_nonexistent_directory(self):
+    def test_nonexistent_directory(self, validate_fn):
         """Test that nonexistent directory raises ArgumentTypeError."""
-        nonexistent = os.path.join(os.sep, "nonexistent", "directory", "12345")
+        nonexistent = _NONEXISTENT
 
         with pytest.raises(argparse.ArgumentTypeError) as exc_info:
-            relink.validate_directory(nonexistent)
+            validate_fn(nonexistent)
 
         assert "does not exist" in str(exc_info.value)
         assert nonexistent in str(exc_info.value)
 
-    def test_relative_path_converted_to_absolute(self, tmp_path):
+    def test_relative_path_converted_to_absolute(self, validate_fn, tmp_path, monkeypatch):
         """Test that relative paths are converted to absolute."""
-        test_dir = tmp_path / "relative_test"
-        test_dir.mkdir()
-
         # Change to parent directory and use relative path
-        cwd = os.getcwd()
-        try:
-            os.chdir(str(tmp_path))
-            result = relink.validate_directory("relative_test")
-            assert os.path.isabs(result)
-            assert result == str(test_dir.resolve())
-        finally:
-            os.chdir(cwd)
-
-    def test_symlink_to_directory(self, tmp_path):
+        monkeypatch.chdir(tmp_path.parent)
+        result = validate_fn(tmp_path.name)
+        assert os.path.isabs(result)
+        assert result == str(tmp_path)
+
+    def test_symlink_to_directory(self, validate_fn, tmp_path):
         """Test that symlink to a directory is accepted."""
         real_dir = tmp_path / "real_dir"
         real_dir.mkdir()
 
         link_dir = tmp_path / "link_dir"
-        link_dir.symlink_to(real_dir)
+        os.symlink(os.fspath(real_dir), os.fspath(link_dir))
 
-        result = relink.validate_paths(str(link_dir))
-        # validate_directory returns absolute path of the symlink itself
+        result = validate_fn(str(link_dir))
+        # Returns absolute path of the symlink itself
         assert result == str(link_dir.absolute())
         # Verify it's still a symlink
         assert os.path.islink(result)
 
-    def test_list_with_invalid_directory(self, tmp_path):
+    def test_list_with_invalid_directory(self, validate_fn, tmp_path):
         """Test that a list with one invalid directory raises error."""
         dir1 = tmp_path / "dir1"
         dir1.mkdir()
         nonexistent = tmp_path / "nonexistent"
 
         with pytest.raises(argparse.ArgumentTypeError) as exc_info:
-            relink.validate_paths([str(dir1), str(nonexistent)])
+            validate_fn([str(dir1), str(nonexistent)])
 
         assert "does not exist" in str(exc_info.value)
 
 
 class TestValidatePaths:
-    """Test suite for validate_paths function."""
-
-    def test_valid_directory(self, tmp_path):
-        """Test that valid directory is accepted and returns absolute path."""
-        test_dir = tmp_path / "valid_dir"
-        test_dir.mkdir()
-
-        result = relink.validate_paths(str(test_dir))
-        assert result == str(test_dir.resolve())
-
-    def test_nonexistent_directory(self):
-        """Test that nonexistent directory raises ArgumentTypeError."""
-        nonexistent = os.path.join(os.sep, "nonexistent", "directory", "12345")
-
-        with pytest.raises(argparse.ArgumentTypeError) as exc_info:
-            relink.validate_paths(nonexistent)
-
-        assert "does not exist" in str(exc_info.value)
-        assert nonexistent in str(exc_info.value)
+    """Test suite for validate_paths function, beyond what's in TestValidateDirectoryAndPaths."""
 
     def test_file_instead_of_directory(self, tmp_path):
         """Test that a file path doesn't raise ArgumentTypeError (or any error)."""
         test_file = tmp_path / "test_file.txt"
-        test_file.write_text("content")
+        test_file.touch()
 
         relink.validate_paths(str(test_file))
 
-    def test_relative_path_converted_to_absolute(self, tmp_path):
-        """Test that relative paths are converted to absolute."""
-        test_dir = tmp_path / "relative_test"
-        test_dir.mkdir()
-
-        # Change to parent directory and use relative path
-        cwd = os.getcwd()
-        try:
-            os.chdir(str(tmp_path))
-            result = relink.validate_paths("relative_test")
-            assert os.path.isabs(result)
-            assert result == str(test_dir.resolve())
-        finally:
-            os.chdir(cwd)
-
-    def test_symlink_to_directory(self, tmp_path):
-        """Test that symlink to a directory is accepted."""
-        real_dir = tmp_path / "real_dir"
-        real_dir.mkdir()
-
-        link_dir = tmp_path / "link_dir"
-        link_dir.symlink_to(real_dir)
-
-        result = relink.validate_paths(str(link_dir))
-        # validate_directory returns absolute path of the symlink itself
-        assert result == str(link_dir.absolute())
-        # Verify it's still a symlink
-        assert os.path.islink(result)
-
-    def test_list_with_invalid_directory(self, tmp_path):
-        """Test that a list with one invalid directory raises error."""
-        dir1 = tmp_path / "dir1"
-        dir1.mkdir()
-        nonexistent = tmp_path / "nonexistent"
-
-        with pytest.raises(argparse.ArgumentTypeError) as exc_info:
-            relink.validate_paths([str(dir1), str(nonexistent)])
-
-        assert "does not exist" in str(exc_info.value)
-
     def test_list_with_file_instead_of_directory(self, tmp_path):
         """Test that a list containing a file doesn't raise error."""
         dir1 = tmp_path / "dir1"
         dir1.mkdir()
         file1 = tmp_path / "file.txt"
-        file1.write_text("content")
+        file1.touch()
 
         relink.validate_paths([str(dir1), str(file1)])
 
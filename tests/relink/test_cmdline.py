@@ -9,6 +9,13 @@ from pathlib import Path
 
 import pytest
 
+from . import REPO_ROOT, MSG_CREATED, MSG_DRY_RUN_MODE, MSG_WOULD_CREATE
+
+RELINK_SCRIPT = os.path.join(REPO_ROOT, "relink.py")
+
+# Every test here spawns a new Python process
+pytestmark = pytest.mark.slow
+
 
 @pytest.fixture(name="mock_dirs")
 def fixture_mock_dirs(tmp_path):
@@ -31,16 +38,10 @@ def test_command_line_execution_dry_run(mock_dirs):
     """Test executing relink.py from command line with --dry-run flag."""
     source_dir, target_dir, source_file, _ = mock_dirs
 
-    # Get the path to relink.py
-    relink_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-        "relink.py",
-    )
-
     # Build the command
     command = [
         sys.executable,
-        relink_script,
+        RELINK_SCRIPT,
         str(source_dir),
         "--target-root",
         str(target_dir),
@@ -56,8 +57,8 @@ def test_command_line_execution_dry_run(mock_dirs):
     assert result.returncode == 0, f"Command failed with stderr: {result.stderr}"
 
     # Verify dry-run messages in output
-    assert "DRY RUN MODE" in result.stdout
-    assert "[DRY RUN] Would create symbolic link:" in result.stdout
+    assert MSG_DRY_RUN_MODE in result.stdout
+    assert MSG_WOULD_CREATE in result.stdout
 
     # Verify no actual changes were made
     assert source_file.is_file()
@@ -68,16 +69,10 @@ def test_command_line_execution_given_dir(mock_dirs):
     """Test executing relink.py from command line given a directory."""
     source_dir, target_dir, source_file, target_file = mock_dirs
 
-    # Get the path to relink.py
-    relink_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-        "relink.py",
-    )
-
     # Build the command
     command = [
         sys.executable,
-        relink_script,
+        RELINK_SCRIPT,
         str(source_dir),
         "--target-root",
         str(target_dir),
@@ -96,23 +91,17 @@ def test_command_line_execution_given_dir(mock_dirs):
     assert os.readlink(str(source_file)) == str(target_file)
 
     # Verify success messages in output
-    assert "Created symbolic link:" in result.stdout
+    assert MSG_CREATED in result.stdout
 
 
 def test_command_line_execution_given_file(mock_dirs):
     """Test executing relink.py from command line given a file."""
     source_dir, target_dir, source_file, target_file = mock_dirs
 
-    # Get the path to relink.py
-    relink_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-        "relink.py",
-    )
-
     # Build the command
     command = [
         sys.executable,
-        relink_script,
+        RELINK_SCRIPT,
         str(source_file),
         "--target-root",
         str(target_dir),
@@ -131,7 +120,31 @@ def test_command_line_execution_given_file(mock_dirs):
     assert os.readlink(str(source_file)) == str(target_file)
 
     # Verify success messages in output
-    assert "Created symbolic link:" in result.stdout
+    assert MSG_CREATED in result.stdout
+
+
+def test_command_line_without_user_env_var(mock_dirs):
+    """Test executing relink.py from command line when $USER and $LOGNAME aren't set."""
+    source_dir, target_dir, source_file, target_file = mock_dirs
+
+    # Build the command
+    command = [
+        sys.executable,
+        RELINK_SCRIPT,
+        str(source_dir),
+        "--target-root",
+        str(target_dir),
+        "--inputdata-root",
+        str(source_dir),
+    ]
+
+    # Execute the command without the variables getpass.getuser() checks first
+    env = {k: v for k, v in os.environ.items() if k not in ("USER", "LOGNAME")}
+    result = subprocess.run(command, capture_output=True, text=True, check=False, env=env)
+
+    # Verify the command executed successfully, falling back to the password database
+    assert result.returncode == 0, f"Command failed with stderr: {result.stderr}"
+    assert os.readlink(source_file) == str(target_file)
 
 
 def test_command_line_multiple_source_dirs(temp_dirs):
@@ -158,16 +171,10 @@ def test_command_line_multiple_source_dirs(temp_dirs):
     target1_file.write_text("target1 content")
     target2_file.write_text("target2 content")
 
-    # Get the path to relink.py
-    relink_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-        "relink.py",
-    )
-
     # Build the command with multiple source directories
     command = [
         sys.executable,
-        relink_script,
+        RELINK_SCRIPT,
         str(source1),
         str(source2),
         "--target-root",
@@ -213,16 +220,10 @@ def test_command_line_source_dir_and_file(temp_dirs):
     target1_file.write_text("target1 content")
     target2_file.write_text("target2 content")
 
-    # Get the path to relink.py
-    relink_script = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-        "relink.py",
-    )
-
     # Build the command
     command = [
         sys.executable,
-        relink_script,
+        RELINK_SCRIPT,
         str(source1),
         source2_file,
         "--target-root",
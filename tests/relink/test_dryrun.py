@@ -3,34 +3,28 @@ Tests for relink.py --dry-run option.
 """
 
 import os
-import sys
 import logging
 from unittest.mock import patch
 
 import pytest
 
-# Add parent directory to path to import relink module
-sys.path.insert(
-    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-)
-# pylint: disable=wrong-import-position
-import relink  # noqa: E402
+import relink
+
+from . import MSG_CREATED, MSG_DELETED, MSG_DRY_RUN_MODE, MSG_WOULD_CREATE
+
+
+# Contents of the source file created by dry_run_setup
+SOURCE_CONTENT = b"source content"
 
 
 @pytest.fixture(name="dry_run_setup")
-def fixture_dry_run_setup(temp_dirs):
+def fixture_dry_run_setup(temp_dirs, current_user, make_pair):
     """Set up directories and files for dry-run tests."""
     source_dir, target_dir = temp_dirs
-    username = os.environ["USER"]
+    username = current_user
 
     # Create files
-    source_file = os.path.join(source_dir, "test_file.txt")
-    target_file = os.path.join(target_dir, "test_file.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source content")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    source_file, target_file = make_pair("test_file.txt", SOURCE_CONTENT)
 
     return source_dir, target_dir, source_file, target_file, username
 
@@ -39,11 +33,6 @@ def test_dry_run_no_changes(dry_run_setup, caplog):
     """Test that dry-run mode makes no actual changes."""
     source_dir, target_dir, source_file, _, username = dry_run_setup
 
-    # Get original file info
-    with open(source_file, "r", encoding="utf-8") as f:
-        original_content = f.read()
-    original_is_link = os.path.islink(source_file)
-
     # Run in dry-run mode
     with caplog.at_level(logging.INFO):
         relink.replace_files_with_symlinks(
@@ -53,12 +42,12 @@ def test_dry_run_no_changes(dry_run_setup, caplog):
     # Verify no changes were made
     assert os.path.isfile(source_file), "Original file should still exist"
     assert not os.path.islink(source_file), "File should not be a symlink"
-    with open(source_file, "r", encoding="utf-8") as f:
-        assert f.read() == original_content
-    assert os.path.islink(source_file) == original_is_link
+    # Contents should be exactly what dry_run_setup wrote
+    with open(source_file, "rb") as f:
+        assert f.read() == SOURCE_CONTENT
 
 
-def test_dry_run_shows_message(dry_run_setup, caplog):
+def test_dry_run_shows_message(dry_run_setup, caplog, logged):
     """Test that dry-run mode shows what would be done."""
     source_dir, target_dir, source_file, target_file, username = dry_run_setup
 
@@ -69,12 +58,12 @@ def test_dry_run_shows_message(dry_run_setup, caplog):
         )
 
     # Check that dry-run messages were logged
-    assert "DRY RUN MODE" in caplog.text
-    assert "[DRY RUN] Would create symbolic link:" in caplog.text
-    assert f"{source_file} -> {target_file}" in caplog.text
+    assert logged(MSG_DRY_RUN_MODE)
+    assert logged(MSG_WOULD_CREATE)
+    assert logged(f"{source_file} -> {target_file}")
 
 
-def test_dry_run_no_delete_or_create_messages(dry_run_setup, caplog):
+def test_dry_run_no_delete_or_create_messages(dry_run_setup, caplog, logged):
     """Test that dry-run doesn't show delete/create messages."""
     source_dir, target_dir, _, _, username = dry_run_setup
 
@@ -85,7 +74,7 @@ def test_dry_run_no_delete_or_create_messages(dry_run_setup, caplog):
         )
 
     # Verify actual operation messages are NOT logged
-    assert "Deleted original file:" not in caplog.text
-    assert "Created symbolic link:" not in caplog.text
+    assert not logged(MSG_DELETED)
+    assert not logged(MSG_CREATED)
     # But the dry-run message should be there
-    assert "[DRY RUN] Would create symbolic link: " in caplog.text
+    assert logged(MSG_WOULD_CREATE)
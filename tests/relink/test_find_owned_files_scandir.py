@@ -11,12 +11,9 @@ from contextlib import contextmanager
 
 import pytest
 
-# Add parent directory to path to import relink module
-sys.path.insert(
-    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-)
-# pylint: disable=wrong-import-position
-import relink  # noqa: E402
+import relink
+
+from . import MSG_ERROR_ACCESSING, MSG_SKIPPING_SYMLINK, make_file
 
 
 class MockDirEntry:
@@ -99,10 +96,8 @@ def test_find_owned_files_basic_indir(temp_dirs):
     file1 = os.path.join(source_dir, "file1.txt")
     file2 = os.path.join(source_dir, "file2.txt")
 
-    with open(file1, "w", encoding="utf-8") as f:
-        f.write("content1")
-    with open(file2, "w", encoding="utf-8") as f:
-        f.write("content2")
+    make_file(file1, b"content1")
+    make_file(file2, b"content2")
 
     # Find owned files
     found_files = list(
@@ -126,8 +121,7 @@ def test_find_owned_files_basic_asfiles(temp_dirs):
     file_list = [file1, file2]
 
     for file in file_list:
-        with open(file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(file)
 
     # Find owned files
     found_files = []
@@ -158,8 +152,7 @@ def test_find_owned_files_nested(temp_dirs):
     file3 = os.path.join(source_dir, nested_path, "level2_file.txt")
 
     for f in [file1, file2, file3]:
-        with open(f, "w", encoding="utf-8") as fp:
-            fp.write("content")
+        make_file(f)
 
     # Find owned files
     found_files = list(
@@ -173,15 +166,47 @@ def test_find_owned_files_nested(temp_dirs):
     assert file3 in found_files
 
 
-def test_skip_symlinks(temp_dirs, caplog):
+def test_find_owned_files_very_deep(temp_dirs):
+    """Test that a tree nested deeper than Python's recursion limit can be searched."""
+    source_dir, _ = temp_dirs
+    user_uid = os.stat(source_dir).st_uid
+
+    # Create a file at the bottom of a very deep directory tree. (Not with os.makedirs(), which is
+    # itself recursive.) This happens inside the try so that a partially built tree still gets
+    # removed.
+    deep_dir = source_dir
+    deep_file = None
+    try:
+        for _ in range(sys.getrecursionlimit() + 100):
+            next_dir = os.path.join(deep_dir, "d")
+            os.mkdir(next_dir)
+            deep_dir = next_dir
+        deep_file = make_file(os.path.join(deep_dir, "deep_file.txt"))
+
+        # Find owned files
+        found_files = list(
+            relink.find_owned_files_scandir(source_dir, user_uid, inputdata_root=source_dir)
+        )
+
+        assert found_files == [deep_file]
+    finally:
+        # Remove the tree from the bottom up, since shutil.rmtree() (which pytest uses to clean up
+        # old temporary directories) is also recursive
+        if deep_file is not None:
+            os.remove(deep_file)
+        while deep_dir != source_dir:
+            os.rmdir(deep_dir)
+            deep_dir = os.path.dirname(deep_dir)
+
+
+def test_skip_symlinks(temp_dirs, caplog, logged):
     """Test that symlinks are skipped and logged."""
     source_dir, _ = temp_dirs
     user_uid = os.stat(source_dir).st_uid
 
     # Create a regular file
     regular_file = os.path.join(source_dir, "regular.txt")
-    with open(regular_file, "w", encoding="utf-8") as f:
-        f.write("content")
+    make_file(regular_file)
 
     # Create a symlink
     symlink_path = os.path.join(source_dir, "link.txt")
@@ -202,11 +227,11 @@ def test_skip_symlinks(temp_dirs, caplog):
     assert symlink_path not in found_files
 
     # Check that "Skipping symlink" message was logged
-    assert "Skipping symlink:" in caplog.text
-    assert symlink_path in caplog.text
+    assert logged(MSG_SKIPPING_SYMLINK)
+    assert logged(symlink_path)
 
 
-def test_skip_symlinks_owned_by_different_user(temp_dirs, caplog):
+def test_skip_symlinks_owned_by_different_user(temp_dirs, caplog, logged):
     """Test that symlinks owned by different users are not logged.
 
     Since find_owned_files_scandir filters by UID first, symlinks owned
@@ -221,8 +246,7 @@ def test_skip_symlinks_owned_by_different_user(temp_dirs, caplog):
 
     # Create a regular file owned by current user
     regular_file = os.path.join(source_dir, "regular.txt")
-    with open(regular_file, "w", encoding="utf-8") as f:
-        f.write("content")
+    make_file(regular_file)
 
     # Create a symlink
     symlink_path = os.path.join(source_dir, "other_user_link.txt")
@@ -248,8 +272,8 @@ def test_skip_symlinks_owned_by_different_user(temp_dirs, caplog):
 
     # Check that "Skipping symlink" message was NOT logged for the other user's symlink
     # (it should be filtered out by UID check before reaching symlink check)
-    if "Skipping symlink:" in caplog.text:
-        assert symlink_path not in caplog.text
+    if logged(MSG_SKIPPING_SYMLINK):
+        assert not logged(symlink_path)
 
 
 def test_empty_directory(temp_dirs):
@@ -266,22 +290,20 @@ def test_empty_directory(temp_dirs):
     assert len(found_files) == 0
 
 
-def test_permission_error_handling(temp_dirs, caplog):
+def test_permission_error_handling(temp_dirs, caplog, logged):
     """Test that permission errors are handled gracefully."""
     source_dir, _ = temp_dirs
     user_uid = os.stat(source_dir).st_uid
 
     # Create a file
     file1 = os.path.join(source_dir, "accessible.txt")
-    with open(file1, "w", encoding="utf-8") as f:
-        f.write("content")
+    make_file(file1)
 
     # Create a subdirectory
     subdir = os.path.join(source_dir, "subdir")
     os.makedirs(subdir)
     file2 = os.path.join(subdir, "file_in_subdir.txt")
-    with open(file2, "w", encoding="utf-8") as f:
-        f.write("content")
+    make_file(file2)
 
     # Remove read permission from subdirectory
     os.chmod(subdir, 0o000)
@@ -300,7 +322,7 @@ def test_permission_error_handling(temp_dirs, caplog):
         assert file2 not in found_files
 
         # Check that error was logged at DEBUG level
-        assert "Error accessing" in caplog.text
+        assert logged(MSG_ERROR_ACCESSING)
     finally:
         # Restore permissions for cleanup
         os.chmod(subdir, 0o755)
@@ -313,8 +335,7 @@ def test_only_files_not_directories(temp_dirs):
 
     # Create files and directories
     file1 = os.path.join(source_dir, "file.txt")
-    with open(file1, "w", encoding="utf-8") as f:
-        f.write("content")
+    make_file(file1)
 
     subdir = os.path.join(source_dir, "subdir")
     os.makedirs(subdir)
@@ -330,7 +351,7 @@ def test_only_files_not_directories(temp_dirs):
     assert subdir not in found_files
 
 
-def test_does_not_follow_symlink_directories(temp_dirs):
+def test_does_not_follow_symlink_directories(temp_dirs, tmp_path_factory):
     """Test that symlinked directories are not followed."""
     source_dir, _ = temp_dirs
     user_uid = os.stat(source_dir).st_uid
@@ -339,30 +360,23 @@ def test_does_not_follow_symlink_directories(temp_dirs):
     real_dir = os.path.join(source_dir, "real_dir")
     os.makedirs(real_dir)
     file_in_real = os.path.join(real_dir, "file.txt")
-    with open(file_in_real, "w", encoding="utf-8") as f:
-        f.write("content")
+    make_file(file_in_real)
 
     # Create a symlink to a directory outside source_dir
-    external_dir = tempfile.mkdtemp()
-    try:
-        external_file = os.path.join(external_dir, "external.txt")
-        with open(external_file, "w", encoding="utf-8") as f:
-            f.write("external content")
+    external_dir = str(tmp_path_factory.mktemp("external"))
+    external_file = os.path.join(external_dir, "external.txt")
+    make_file(external_file, b"external content")
 
-        symlink_dir = os.path.join(source_dir, "link_to_external")
-        os.symlink(external_dir, symlink_dir)
+    symlink_dir = os.path.join(source_dir, "link_to_external")
+    os.symlink(external_dir, symlink_dir)
 
-        # Find owned files
-        found_files = list(
-            relink.find_owned_files_scandir(
-                source_dir, user_uid, inputdata_root=source_dir
-            )
+    # Find owned files
+    found_files = list(
+        relink.find_owned_files_scandir(
+            source_dir, user_uid, inputdata_root=source_dir
         )
+    )
 
-        # Should find file in real directory but not in symlinked directory
-        assert file_in_real in found_files
-        assert external_file not in found_files
-    finally:
-        # Cleanup
-        os.remove(external_file)
-        os.rmdir(external_dir)
+    # Should find file in real directory but not in symlinked directory
+    assert file_in_real in found_files
+    assert external_file not in found_files
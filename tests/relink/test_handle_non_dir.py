@@ -5,19 +5,15 @@ Tests of handle_non_dir() and _handle_non_dir_entry() in relink.py
 # pylint: disable=protected-access
 
 import os
-import sys
 import tempfile
 import logging
 from unittest.mock import Mock, patch
 
 import pytest
 
-# Add parent directory to path to import relink module
-sys.path.insert(
-    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-)
-# pylint: disable=wrong-import-position
-import relink  # noqa: E402
+import relink
+
+from . import MSG_SKIPPING_SYMLINK, make_file
 
 
 @pytest.fixture(name="mock_direntry")
@@ -121,8 +117,7 @@ class TestHandleNonDirEntry:
 
         # Create a regular file
         test_file = os.path.join(source_dir, "test.txt")
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Get DirEntry for the file
         with os.scandir(source_dir) as entries:
@@ -131,9 +126,7 @@ class TestHandleNonDirEntry:
 
         assert result == test_file
 
-    def test_returns_none_for_file_owned_by_different_user(
-        self, temp_dirs, mock_direntry
-    ):
+    def test_returns_none_for_file_owned_by_different_user(self, temp_dirs, mock_direntry):
         """Test that files owned by different users return None."""
         source_dir, _ = temp_dirs
         user_uid = os.stat(source_dir).st_uid
@@ -141,8 +134,7 @@ class TestHandleNonDirEntry:
 
         # Create a file
         test_file = os.path.join(source_dir, "test.txt")
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Create mock entry with different UID
         mock_entry = mock_direntry(
@@ -153,7 +145,7 @@ class TestHandleNonDirEntry:
 
         assert result is None
 
-    def test_returns_none_and_logs_for_owned_symlink(self, temp_dirs, caplog):
+    def test_returns_none_and_logs_for_owned_symlink(self, temp_dirs, caplog, logged):
         """Test that owned symlinks return None and are logged."""
         source_dir, _ = temp_dirs
         user_uid = os.stat(source_dir).st_uid
@@ -171,11 +163,11 @@ class TestHandleNonDirEntry:
                 result = relink._handle_non_dir_entry(entry, user_uid)
 
         assert result is None
-        assert "Skipping symlink:" in caplog.text
-        assert symlink_path in caplog.text
+        assert logged(MSG_SKIPPING_SYMLINK)
+        assert logged(symlink_path)
 
     def test_returns_none_for_symlink_owned_by_different_user(
-        self, temp_dirs, caplog, mock_direntry
+        self, temp_dirs, caplog, logged, mock_direntry
     ):
         """Test that symlinks owned by different users return None without logging."""
         source_dir, _ = temp_dirs
@@ -197,7 +189,19 @@ class TestHandleNonDirEntry:
 
         assert result is None
         # Should NOT log because it's not owned by the user
-        assert "Skipping symlink:" not in caplog.text
+        assert not logged(MSG_SKIPPING_SYMLINK)
+
+    def test_symlink_not_statted_unless_debug(self, caplog, mock_direntry):
+        """Test that symlinks are skipped without a stat call when debug logging is off."""
+        mock_entry = mock_direntry(
+            "link.txt", "/some/link.txt", 1234, is_file=False, is_symlink=True
+        )
+
+        with caplog.at_level(logging.INFO, logger=relink.logger.name):
+            result = relink._handle_non_dir_entry(mock_entry, 1234)
+
+        assert result is None
+        mock_entry.stat.assert_not_called()
 
     def test_handles_file_with_spaces(self, temp_dirs):
         """Test that files with spaces in names are handled correctly."""
@@ -206,8 +210,7 @@ class TestHandleNonDirEntry:
 
         # Create a file with spaces
         test_file = os.path.join(source_dir, "file with spaces.txt")
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Get DirEntry for the file
         with os.scandir(source_dir) as entries:
@@ -224,8 +227,7 @@ class TestHandleNonDirEntry:
         # Create a file with special characters
         filename = "file-with_special.chars@123.txt"
         test_file = os.path.join(source_dir, filename)
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Get DirEntry for the file
         with os.scandir(source_dir) as entries:
@@ -249,8 +251,7 @@ class TestHandleNonDirStr:
 
         # Create a regular file
         test_file = os.path.join(source_dir, "test.txt")
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Get path of the file
         result = relink._handle_non_dir_str(test_file, user_uid)
@@ -267,8 +268,7 @@ class TestHandleNonDirStr:
 
         # Create a file
         test_file = os.path.join(source_dir, "test.txt")
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Create mock stat function
         mock_stat = mock_stat_with_different_uid(test_file, different_uid)
@@ -278,7 +278,7 @@ class TestHandleNonDirStr:
 
         assert result is None
 
-    def test_returns_none_and_logs_for_owned_symlink(self, temp_dirs, caplog):
+    def test_returns_none_and_logs_for_owned_symlink(self, temp_dirs, caplog, logged):
         """Test that owned symlinks return None and are logged."""
         source_dir, _ = temp_dirs
         user_uid = os.stat(source_dir).st_uid
@@ -293,11 +293,11 @@ class TestHandleNonDirStr:
             result = relink._handle_non_dir_str(symlink_path, user_uid)
 
         assert result is None
-        assert "Skipping symlink:" in caplog.text
-        assert symlink_path in caplog.text
+        assert logged(MSG_SKIPPING_SYMLINK)
+        assert logged(symlink_path)
 
     def test_returns_none_for_symlink_owned_by_different_user(
-        self, temp_dirs, caplog, mock_stat_with_different_uid
+        self, temp_dirs, caplog, logged, mock_stat_with_different_uid
     ):
         """Test that symlinks owned by different users return None without logging."""
         source_dir, _ = temp_dirs
@@ -318,7 +318,7 @@ class TestHandleNonDirStr:
 
         assert result is None
         # Should NOT log because it's not owned by the user
-        assert "Skipping symlink:" not in caplog.text
+        assert not logged(MSG_SKIPPING_SYMLINK)
 
     def test_handles_file_with_spaces(self, temp_dirs):
         """Test that files with spaces in names are handled correctly."""
@@ -327,8 +327,7 @@ class TestHandleNonDirStr:
 
         # Create a file with spaces
         test_file = os.path.join(source_dir, "file with spaces.txt")
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Get path of the file
         result = relink._handle_non_dir_str(test_file, user_uid)
@@ -343,8 +342,7 @@ class TestHandleNonDirStr:
         # Create a file with special characters
         filename = "file-with_special.chars@123.txt"
         test_file = os.path.join(source_dir, filename)
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Get path of the file
         result = relink._handle_non_dir_str(test_file, user_uid)
@@ -376,8 +374,7 @@ class TestHandleNonDir:
 
         # Create a regular file
         test_file = os.path.join(source_dir, "test.txt")
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Get DirEntry for the file
         with os.scandir(source_dir) as entries:
@@ -393,8 +390,7 @@ class TestHandleNonDir:
 
         # Create a regular file
         test_file = os.path.join(source_dir, "test.txt")
-        with open(test_file, "w", encoding="utf-8") as f:
-            f.write("content")
+        make_file(test_file)
 
         # Get path of the file
         result = relink.handle_non_dir(test_file, user_uid)
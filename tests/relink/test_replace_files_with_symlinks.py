@@ -5,42 +5,39 @@ replace_one_file_with_symlink() is tested in test_replace_one_file_with_symlink.
 """
 
 import os
-import sys
 import tempfile
-import pwd
 import logging
-from unittest.mock import patch, call
+from unittest.mock import call
 import pytest
 
-# Add parent directory to path to import relink module
-sys.path.insert(
-    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-)
-# pylint: disable=wrong-import-position
-import relink  # noqa: E402
+import relink
 
+from . import MSG_SEARCHING, make_file
 
-@pytest.fixture(name="mock_replace_one")
-def fixture_mock_replace_one():
-    """Fixture that mocks relink.replace_one_file_with_symlink"""
-    with patch("relink.replace_one_file_with_symlink") as mock:
-        yield mock
 
+@pytest.fixture(name="replace_one_calls")
+def fixture_replace_one_calls(monkeypatch):
+    """
+    Fixture that replaces relink.replace_one_file_with_symlink with a stub that just records how
+    it was called.
 
-def test_basic_file_replacement_given_dir(temp_dirs, current_user, mock_replace_one):
+    Returns:
+        list: The call() for each invocation, in order.
+    """
+    calls = []
+    monkeypatch.setattr(
+        relink, "replace_one_file_with_symlink", lambda *a, **k: calls.append(call(*a, **k))
+    )
+    return calls
+
+
+def test_basic_file_replacement_given_dir(temp_dirs, make_pair, current_user, replace_one_calls):
     """Test basic functionality: given directory, replace owned file with symlink."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
 
-    # Create a file in source directory
-    source_file = os.path.join(inputdata_root, "test_file.txt")
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source content")
-
-    # Create corresponding file in target directory
-    target_file = os.path.join(target_dir, "test_file.txt")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    # Create a file in source directory and its counterpart in target directory
+    source_file, _ = make_pair("test_file.txt")
 
     # Run the function
     relink.replace_files_with_symlinks(
@@ -48,28 +45,23 @@ def test_basic_file_replacement_given_dir(temp_dirs, current_user, mock_replace_
     )
 
     # Verify replace_one_file_with_symlink() was called correctly
-    mock_replace_one.assert_called_once_with(
-        inputdata_root,
-        target_dir,
-        source_file,
-        dry_run=False,
-    )
+    assert replace_one_calls == [
+        call(
+            inputdata_root,
+            target_dir,
+            source_file,
+            dry_run=False,
+        )
+    ]
 
 
-def test_basic_file_replacement_given_file(temp_dirs, current_user, mock_replace_one):
+def test_basic_file_replacement_given_file(temp_dirs, make_pair, current_user, replace_one_calls):
     """Test basic functionality: given owned file, replace with symlink."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
 
-    # Create a file in source directory
-    source_file = os.path.join(inputdata_root, "test_file.txt")
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source content")
-
-    # Create corresponding file in target directory
-    target_file = os.path.join(target_dir, "test_file.txt")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    # Create a file in source directory and its counterpart in target directory
+    source_file, _ = make_pair("test_file.txt")
 
     # Run the function
     relink.replace_files_with_symlinks(
@@ -77,28 +69,23 @@ def test_basic_file_replacement_given_file(temp_dirs, current_user, mock_replace
     )
 
     # Verify replace_one_file_with_symlink() was called correctly
-    mock_replace_one.assert_called_once_with(
-        inputdata_root,
-        target_dir,
-        source_file,
-        dry_run=False,
-    )
+    assert replace_one_calls == [
+        call(
+            inputdata_root,
+            target_dir,
+            source_file,
+            dry_run=False,
+        )
+    ]
 
 
-def test_dry_run(temp_dirs, current_user, mock_replace_one):
+def test_dry_run(temp_dirs, make_pair, current_user, replace_one_calls):
     """Test that dry_run=True is passed correctly."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
 
-    # Create a file in source directory
-    source_file = os.path.join(inputdata_root, "test_file.txt")
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source content")
-
-    # Create corresponding file in target directory
-    target_file = os.path.join(target_dir, "test_file.txt")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    # Create a file in source directory and its counterpart in target directory
+    source_file, _ = make_pair("test_file.txt")
 
     # Run the function
     relink.replace_files_with_symlinks(
@@ -110,32 +97,23 @@ def test_dry_run(temp_dirs, current_user, mock_replace_one):
     )
 
     # Verify replace_one_file_with_symlink() was called correctly
-    mock_replace_one.assert_called_once_with(
-        inputdata_root,
-        target_dir,
-        source_file,
-        dry_run=True,
-    )
+    assert replace_one_calls == [
+        call(
+            inputdata_root,
+            target_dir,
+            source_file,
+            dry_run=True,
+        )
+    ]
 
 
-def test_nested_directory_structure(temp_dirs, current_user, mock_replace_one):
+def test_nested_directory_structure(temp_dirs, make_pair, current_user, replace_one_calls):
     """Test with nested directory structures."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
 
-    # Create nested directories
-    nested_path = os.path.join("subdir1", "subdir2")
-    os.makedirs(os.path.join(inputdata_root, nested_path))
-    os.makedirs(os.path.join(target_dir, nested_path))
-
     # Create files in nested directories
-    source_file = os.path.join(inputdata_root, nested_path, "nested_file.txt")
-    target_file = os.path.join(target_dir, nested_path, "nested_file.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("nested source")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("nested target")
+    source_file, _ = make_pair(os.path.join("subdir1", "subdir2", "nested_file.txt"))
 
     # Run the function
     relink.replace_files_with_symlinks(
@@ -143,23 +121,24 @@ def test_nested_directory_structure(temp_dirs, current_user, mock_replace_one):
     )
 
     # Verify replace_one_file_with_symlink() was called correctly
-    mock_replace_one.assert_called_once_with(
-        inputdata_root,
-        target_dir,
-        source_file,
-        dry_run=False,
-    )
+    assert replace_one_calls == [
+        call(
+            inputdata_root,
+            target_dir,
+            source_file,
+            dry_run=False,
+        )
+    ]
 
 
-def test_skip_existing_symlinks(temp_dirs, current_user, caplog, mock_replace_one):
+def test_skip_existing_symlinks(temp_dirs, current_user, caplog, replace_one_calls):
     """Test that existing symlinks are skipped."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
 
     # Create a target file
     target_file = os.path.join(target_dir, "target.txt")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target")
+    make_file(target_file, b"target")
 
     # Create a symlink in source (pointing somewhere else)
     source_link = os.path.join(inputdata_root, "existing_link.txt")
@@ -173,18 +152,17 @@ def test_skip_existing_symlinks(temp_dirs, current_user, caplog, mock_replace_on
         )
 
     # Verify replace_one_file_with_symlink() wasn't called
-    mock_replace_one.assert_not_called()
+    assert not replace_one_calls
 
 
-def test_missing_target_file(temp_dirs, current_user, caplog, mock_replace_one):
+def test_missing_target_file(temp_dirs, current_user, caplog, replace_one_calls):
     """Test behavior when target file doesn't exist."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
 
     # Create only source file (no corresponding target)
     source_file = os.path.join(inputdata_root, "orphan.txt")
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("orphan content")
+    make_file(source_file, b"orphan content")
 
     # Run the function
     with caplog.at_level(logging.INFO):
@@ -193,66 +171,96 @@ def test_missing_target_file(temp_dirs, current_user, caplog, mock_replace_one):
         )
 
     # Verify replace_one_file_with_symlink() was called correctly
-    mock_replace_one.assert_called_once_with(
-        inputdata_root,
-        target_dir,
-        source_file,
-        dry_run=False,
-    )
+    assert replace_one_calls == [
+        call(
+            inputdata_root,
+            target_dir,
+            source_file,
+            dry_run=False,
+        )
+    ]
 
 
-def test_invalid_username(temp_dirs, caplog, mock_replace_one):
+def test_invalid_username(temp_dirs, known_missing_user, caplog, replace_one_calls):
     """Test behavior with invalid username."""
     inputdata_root, target_dir = temp_dirs
 
-    # Use a username that doesn't exist
-    invalid_username = "nonexistent_user_12345"
-    try:
-        pwd.getpwnam(invalid_username).pw_uid
-    except KeyError:
-        pass
-    else:
-        raise RuntimeError(f"{invalid_username=} DOES actually exist")
-
-    # Run the function
+    # Run the function with a username that doesn't exist
     with caplog.at_level(logging.INFO):
         relink.replace_files_with_symlinks(
-            inputdata_root, target_dir, invalid_username, inputdata_root=inputdata_root
+            inputdata_root, target_dir, known_missing_user, inputdata_root=inputdata_root
         )
 
     # Verify replace_one_file_with_symlink() wasn't called
-    mock_replace_one.assert_not_called()
+    assert not replace_one_calls
 
 
-def test_multiple_files(temp_dirs, current_user, mock_replace_one):
+@pytest.mark.parametrize("jobs", [1, 4], ids=["serial", "threaded"])
+def test_multiple_files(temp_dirs, make_pair, current_user, replace_one_calls, jobs):
     """Test with multiple files in the directory."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
 
-    # Create multiple files
-    for i in range(5):
-        source_file = os.path.join(inputdata_root, f"file_{i}.txt")
-        target_file = os.path.join(target_dir, f"file_{i}.txt")
-
-        with open(source_file, "w", encoding="utf-8") as f:
-            f.write(f"source {i}")
-        with open(target_file, "w", encoding="utf-8") as f:
-            f.write(f"target {i}")
+    # Create multiple files. With threads, more than can be queued at once.
+    n_files = 5 * jobs * 4
+    for i in range(n_files):
+        make_pair(f"file_{i}.txt")
 
     # Run the function
     relink.replace_files_with_symlinks(
-        inputdata_root, target_dir, username, inputdata_root=inputdata_root
+        inputdata_root, target_dir, username, inputdata_root=inputdata_root, jobs=jobs
     )
 
-    # Verify replace_one_file_with_symlink() was called correctly
+    # Verify replace_one_file_with_symlink() was called once per file, in any order
     calls = []
-    for i in range(5):
+    for i in range(n_files):
         source_file = os.path.join(inputdata_root, f"file_{i}.txt")
         calls.append(call(inputdata_root, target_dir, source_file, dry_run=False))
-    mock_replace_one.assert_has_calls(calls, any_order=True)
+    assert len(replace_one_calls) == len(calls)
+    for c in calls:
+        assert c in replace_one_calls
+
+
+def test_multiple_files_with_jobs_replaced(temp_dirs, make_pair, current_user):
+    """Test that files really are replaced with symlinks when using multiple threads."""
+    inputdata_root, target_dir = temp_dirs
+    username = current_user
+
+    # Create more files than can be queued at once
+    jobs = 2
+    pairs = [make_pair(f"file_{i}.txt") for i in range(5 * jobs * 4)]
+
+    # Run the function
+    relink.replace_files_with_symlinks(
+        inputdata_root, target_dir, username, inputdata_root=inputdata_root, jobs=jobs
+    )
+
+    # Verify every file was replaced with a symlink to its counterpart
+    for source_file, target_file in pairs:
+        assert os.path.islink(source_file)
+        assert os.readlink(source_file) == target_file
+
+
+def test_multiple_files_with_jobs_error(temp_dirs, make_pair, current_user, monkeypatch):
+    """Test that an unexpected exception in a worker thread reaches the caller."""
+    inputdata_root, target_dir = temp_dirs
+    username = current_user
+
+    for i in range(20):
+        make_pair(f"file_{i}.txt")
+
+    def mock_replace_one(*args, **kwargs):
+        raise RuntimeError("Worker failed")
 
+    monkeypatch.setattr(relink, "replace_one_file_with_symlink", mock_replace_one)
+
+    with pytest.raises(RuntimeError, match="Worker failed"):
+        relink.replace_files_with_symlinks(
+            inputdata_root, target_dir, username, inputdata_root=inputdata_root, jobs=4
+        )
 
-def test_multiple_files_nested(temp_dirs, current_user, mock_replace_one):
+
+def test_multiple_files_nested(temp_dirs, make_pair, current_user, replace_one_calls):
     """Test with multiple files scattered throughout a nested directory tree."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
@@ -269,21 +277,7 @@ def test_multiple_files_nested(temp_dirs, current_user, mock_replace_one):
     ]
 
     # Create all files and their parent directories
-    source_files = []
-    for rel_path in test_files:
-        source_file = os.path.join(inputdata_root, rel_path)
-        source_files.append(source_file)
-        target_file = os.path.join(target_dir, rel_path)
-
-        # Create parent directories
-        os.makedirs(os.path.dirname(source_file), exist_ok=True)
-        os.makedirs(os.path.dirname(target_file), exist_ok=True)
-
-        # Create files
-        with open(source_file, "w", encoding="utf-8") as f:
-            f.write(f"source content for {rel_path}")
-        with open(target_file, "w", encoding="utf-8") as f:
-            f.write(f"target content for {rel_path}")
+    source_files = [make_pair(rel_path)[0] for rel_path in test_files]
 
     # Run the function
     relink.replace_files_with_symlinks(
@@ -294,47 +288,41 @@ def test_multiple_files_nested(temp_dirs, current_user, mock_replace_one):
     calls = []
     for source_file in source_files:
         calls.append(call(inputdata_root, target_dir, source_file, dry_run=False))
-    mock_replace_one.assert_has_calls(calls, any_order=True)
+    assert len(replace_one_calls) == len(calls)
+    for c in calls:
+        assert c in replace_one_calls
 
 
-def test_absolute_paths(temp_dirs, current_user, mock_replace_one):
+def test_absolute_paths(temp_dirs, make_pair, current_user, replace_one_calls, monkeypatch):
     """Test that function handles relative paths by converting to absolute."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
 
     # Create test files
-    source_file = os.path.join(inputdata_root, "test.txt")
-    target_file = os.path.join(target_dir, "test.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("test")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("test target")
+    source_file, _ = make_pair("test.txt")
 
     # Use relative paths (if possible)
-    cwd = os.getcwd()
-    try:
-        os.chdir(os.path.dirname(inputdata_root))
-        rel_source = os.path.basename(inputdata_root)
-        rel_target = os.path.basename(target_dir)
+    monkeypatch.chdir(os.path.dirname(inputdata_root))
+    rel_source = os.path.basename(inputdata_root)
+    rel_target = os.path.basename(target_dir)
 
-        # Run with relative paths
-        relink.replace_files_with_symlinks(
-            rel_source, rel_target, username, inputdata_root=inputdata_root
-        )
-    finally:
-        os.chdir(cwd)
+    # Run with relative paths
+    relink.replace_files_with_symlinks(
+        rel_source, rel_target, username, inputdata_root=inputdata_root
+    )
 
     # Verify replace_one_file_with_symlink() was called correctly
-    mock_replace_one.assert_called_once_with(
-        inputdata_root,
-        target_dir,
-        source_file,
-        dry_run=False,
-    )
+    assert replace_one_calls == [
+        call(
+            inputdata_root,
+            target_dir,
+            source_file,
+            dry_run=False,
+        )
+    ]
 
 
-def test_print_searching_message(temp_dirs, current_user, caplog):
+def test_print_searching_message(temp_dirs, current_user, caplog, logged):
     """Test that searching message is printed."""
     inputdata_root, target_dir = temp_dirs
     username = current_user
@@ -346,14 +334,14 @@ def test_print_searching_message(temp_dirs, current_user, caplog):
         )
 
     # Check that searching message was logged
-    assert f"Searching for files owned by '{username}'" in caplog.text
-    assert f"in '{os.path.abspath(inputdata_root)}'" in caplog.text
+    assert logged(f"{MSG_SEARCHING} '{username}'")
+    assert logged(f"in '{os.path.abspath(inputdata_root)}'")
 
 
-def test_empty_directories(temp_dirs, mock_replace_one):
+def test_empty_directories(temp_dirs, current_user, replace_one_calls):
     """Test with empty directories."""
     inputdata_root, target_dir = temp_dirs
-    username = os.environ["USER"]
+    username = current_user
 
     # Run with empty directories (should not crash)
     relink.replace_files_with_symlinks(
@@ -361,22 +349,16 @@ def test_empty_directories(temp_dirs, mock_replace_one):
     )
 
     # Verify replace_one_file_with_symlink() wasn't called
-    mock_replace_one.assert_not_called()
+    assert not replace_one_calls
 
 
-def test_file_with_spaces_in_name(temp_dirs, mock_replace_one):
+def test_file_with_spaces_in_name(temp_dirs, current_user, make_pair, replace_one_calls):
     """Test files with spaces in their names."""
     inputdata_root, target_dir = temp_dirs
-    username = os.environ["USER"]
+    username = current_user
 
     # Create files with spaces
-    source_file = os.path.join(inputdata_root, "file with spaces.txt")
-    target_file = os.path.join(target_dir, "file with spaces.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("content")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    source_file, _ = make_pair("file with spaces.txt")
 
     # Run the function
     relink.replace_files_with_symlinks(
@@ -384,28 +366,24 @@ def test_file_with_spaces_in_name(temp_dirs, mock_replace_one):
     )
 
     # Verify replace_one_file_with_symlink() was called correctly
-    mock_replace_one.assert_called_once_with(
-        inputdata_root,
-        target_dir,
-        source_file,
-        dry_run=False,
-    )
+    assert replace_one_calls == [
+        call(
+            inputdata_root,
+            target_dir,
+            source_file,
+            dry_run=False,
+        )
+    ]
 
 
-def test_file_with_special_characters(temp_dirs, mock_replace_one):
+def test_file_with_special_characters(temp_dirs, current_user, make_pair, replace_one_calls):
     """Test files with special characters in names."""
     inputdata_root, target_dir = temp_dirs
-    username = os.environ["USER"]
+    username = current_user
 
     # Create files with special chars (that are valid in filenames)
     filename = "file-with_special.chars@123.txt"
-    source_file = os.path.join(inputdata_root, filename)
-    target_file = os.path.join(target_dir, filename)
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("content")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    source_file, _ = make_pair(filename)
 
     # Run the function
     relink.replace_files_with_symlinks(
@@ -413,9 +391,11 @@ def test_file_with_special_characters(temp_dirs, mock_replace_one):
     )
 
     # Verify replace_one_file_with_symlink() was called correctly
-    mock_replace_one.assert_called_once_with(
-        inputdata_root,
-        target_dir,
-        source_file,
-        dry_run=False,
-    )
+    assert replace_one_calls == [
+        call(
+            inputdata_root,
+            target_dir,
+            source_file,
+            dry_run=False,
+        )
+    ]
@@ -3,256 +3,220 @@ Tests of replace_one_file_with_symlink() in relink.py
 """
 
 import os
-import sys
 import logging
+from contextlib import ExitStack
 from unittest.mock import patch
 
-# Add parent directory to path to import relink module
-sys.path.insert(
-    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+
+import relink
+
+from . import (
+    MSG_CREATED,
+    MSG_DELETED,
+    MSG_ERROR_REMOVING_TMP,
+    MSG_ERROR_REPLACING,
+    MSG_ERROR_SYMLINK,
+    MSG_FOUND_OWNED,
+    MSG_NOT_FOUND,
+    MSG_STALE_TMP,
+    MSG_TARGET_MISSING,
+    make_file,
 )
-# pylint: disable=wrong-import-position
-import relink  # noqa: E402
 
 
-def test_basic_file_replacement(temp_dirs):
-    """Test basic functionality: replace owned file with symlink."""
+@pytest.mark.parametrize(
+    "rel_path",
+    [
+        "test_file.txt",
+        os.path.join("subdir1", "subdir2", "nested_file.txt"),
+        "file with spaces.txt",
+        "file-with_special.chars@123.txt",
+    ],
+    ids=["basic", "nested", "spaces", "special_chars"],
+)
+def test_file_replacement(temp_dirs, make_pair, rel_path):
+    """Test replacing an owned file with a symlink, for a variety of file paths."""
     source_dir, target_dir = temp_dirs
 
-    # Create a file in source directory
-    source_file = os.path.join(source_dir, "test_file.txt")
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source content")
-
-    # Create corresponding file in target directory
-    target_file = os.path.join(target_dir, "test_file.txt")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    # Create the file in source directory and its counterpart in target directory
+    source_file, target_file = make_pair(rel_path)
 
     # Run the function
     relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
 
-    # Verify the source file is now a symlink
-    assert os.path.islink(source_file), "Source file should be a symlink"
+    # Verify the source file is now a symlink to the target file. (No need to check islink()
+    # first: readlink() raises OSError for anything that isn't a symlink.)
     assert (
         os.readlink(source_file) == target_file
     ), "Symlink should point to target file"
 
 
-def test_nested_directory_structure(temp_dirs):
-    """Test with nested directory structures."""
-    source_dir, target_dir = temp_dirs
-
-    # Create nested directories
-    nested_path = os.path.join("subdir1", "subdir2")
-    os.makedirs(os.path.join(source_dir, nested_path))
-    os.makedirs(os.path.join(target_dir, nested_path))
-
-    # Create files in nested directories
-    source_file = os.path.join(source_dir, nested_path, "nested_file.txt")
-    target_file = os.path.join(target_dir, nested_path, "nested_file.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("nested source")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("nested target")
-
-    # Run the function
-    relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
-
-    # Verify
-    assert os.path.islink(source_file), "Nested file should be a symlink"
-    assert os.readlink(source_file) == target_file
-
-
-def test_missing_target_file(temp_dirs, caplog):
+def test_missing_target_file(temp_dirs, caplog, logged):
     """Test behavior when target file doesn't exist."""
     source_dir, target_dir = temp_dirs
 
     # Create only source file (no corresponding target)
     source_file = os.path.join(source_dir, "orphan.txt")
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("orphan content")
+    make_file(source_file, b"orphan content")
 
     # Run the function
-    with caplog.at_level(logging.INFO):
-        relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
+    caplog.set_level(logging.INFO, logger=relink.logger.name)
+    relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
 
     # Verify the file is NOT converted to symlink
     assert not os.path.islink(source_file), "File should not be a symlink"
     assert os.path.isfile(source_file), "Original file should still exist"
 
     # Check warning message
-    assert "Warning: Corresponding file " in caplog.text
-    assert " not found" in caplog.text
+    assert logged(MSG_TARGET_MISSING)
+    assert logged(MSG_NOT_FOUND)
 
 
-def test_absolute_paths(temp_dirs):
+def test_absolute_paths(temp_dirs, make_pair, monkeypatch):
     """Test that function handles relative paths by converting to absolute."""
     source_dir, target_dir = temp_dirs
 
     # Create test files
-    source_file = os.path.join(source_dir, "test.txt")
-    target_file = os.path.join(target_dir, "test.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("test")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("test target")
+    source_file, _ = make_pair("test.txt")
 
     # Use relative paths (if possible)
-    cwd = os.getcwd()
-    try:
-        os.chdir(os.path.dirname(source_dir))
-        rel_source = os.path.basename(source_dir)
-        rel_target = os.path.basename(target_dir)
+    monkeypatch.chdir(os.path.dirname(source_dir))
+    rel_source = os.path.basename(source_dir)
+    rel_target = os.path.basename(target_dir)
+
+    # Run with relative paths
+    relink.replace_one_file_with_symlink(rel_source, rel_target, source_file)
+
+    # Verify it still works
+    assert os.path.islink(source_file)
+
+
+def test_inputdata_root_with_trailing_slash(temp_dirs, make_pair):
+    """Test that a trailing slash on inputdata_root (as in DEFAULT_SOURCE_ROOT) is handled."""
+    source_dir, target_dir = temp_dirs
 
-        # Run with relative paths
-        relink.replace_one_file_with_symlink(rel_source, rel_target, source_file)
+    # Create test files
+    source_file, target_file = make_pair(os.path.join("subdir", "test.txt"))
 
-        # Verify it still works
-        assert os.path.islink(source_file)
-    finally:
-        os.chdir(cwd)
+    # Run with a trailing slash on inputdata_root
+    relink.replace_one_file_with_symlink(source_dir + os.sep, target_dir, source_file)
 
+    # Verify the symlink points to the right place
+    assert os.readlink(source_file) == target_file
 
-def test_print_found_owned_file(temp_dirs, caplog):
+
+def test_print_found_owned_file(temp_dirs, make_pair, caplog, logged):
     """Test that 'Found owned file' message is printed."""
     source_dir, target_dir = temp_dirs
 
     # Create a file owned by current user
-    source_file = os.path.join(source_dir, "owned_file.txt")
-    target_file = os.path.join(target_dir, "owned_file.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("content")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    source_file, _ = make_pair("owned_file.txt")
 
     # Run the function
-    with caplog.at_level(logging.INFO):
-        relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
+    caplog.set_level(logging.INFO, logger=relink.logger.name)
+    relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
 
     # Check that "Found owned file" message was logged
-    assert "Found owned file:" in caplog.text
-    assert source_file in caplog.text
+    assert logged(MSG_FOUND_OWNED)
+    assert logged(source_file)
 
 
-def test_print_deleted_and_created_messages(temp_dirs, caplog):
+def test_print_deleted_and_created_messages(temp_dirs, make_pair, caplog, logged):
     """Test that deleted and created symlink messages are printed."""
     source_dir, target_dir = temp_dirs
 
     # Create files
-    source_file = os.path.join(source_dir, "test_file.txt")
-    target_file = os.path.join(target_dir, "test_file.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target")
+    source_file, target_file = make_pair("test_file.txt")
 
     # Run the function
-    with caplog.at_level(logging.INFO):
-        relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
+    caplog.set_level(logging.INFO, logger=relink.logger.name)
+    relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
 
     # Check messages
-    assert "Deleted original file:" in caplog.text
-    assert "Created symbolic link:" in caplog.text
-    assert f"{source_file} -> {target_file}" in caplog.text
-
-
-def test_error_creating_symlink(temp_dirs, caplog):
-    """Test error message when symlink creation fails."""
-    source_dir, target_dir = temp_dirs
-
-    # Create source file
-    source_file = os.path.join(source_dir, "test.txt")
-    target_file = os.path.join(target_dir, "test.txt")
+    assert logged(MSG_DELETED)
+    assert logged(MSG_CREATED)
+    assert logged(f"{source_file} -> {target_file}")
 
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target")
+    # Each message should be one line, so any formatter prefix (timestamp, level) lands on each
+    assert not any("\n" in r.getMessage() for r in caplog.records)
 
-    # Mock os.symlink to raise an error
-    def mock_symlink(src, dst):
-        raise OSError("Simulated symlink error")
 
-    with patch("os.symlink", side_effect=mock_symlink):
-        # Run the function
-        with caplog.at_level(logging.INFO):
-            relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
-
-        # Check error message
-        assert "Error creating symlink" in caplog.text
-        assert source_file in caplog.text
-
-
-def test_file_with_spaces_in_name(temp_dirs):
-    """Test files with spaces in their names."""
+def test_stale_temporary_link(temp_dirs, make_pair, caplog, logged):
+    """Test that a temporary link left behind by an interrupted run is cleared away."""
     source_dir, target_dir = temp_dirs
 
-    # Create files with spaces
-    source_file = os.path.join(source_dir, "file with spaces.txt")
-    target_file = os.path.join(target_dir, "file with spaces.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("content")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    # Create files, plus a stale temporary link pointing somewhere else
+    source_file, target_file = make_pair("test.txt")
+    os.symlink(os.path.join(target_dir, "elsewhere.txt"), source_file + ".relink.tmp")
 
     # Run the function
+    caplog.set_level(logging.INFO, logger=relink.logger.name)
     relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
 
-    # Verify
-    assert os.path.islink(source_file)
+    # Verify the file was replaced and the stale link is gone
     assert os.readlink(source_file) == target_file
+    assert os.listdir(source_dir) == ["test.txt"]
+    assert logged(MSG_STALE_TMP)
 
 
-def test_file_with_special_characters(temp_dirs):
-    """Test files with special characters in names."""
+def test_temporary_name_taken_by_file(temp_dirs, make_pair, caplog, logged):
+    """Test that a regular file where the temporary link would go is left alone."""
     source_dir, target_dir = temp_dirs
 
-    # Create files with special chars (that are valid in filenames)
-    filename = "file-with_special.chars@123.txt"
-    source_file = os.path.join(source_dir, filename)
-    target_file = os.path.join(target_dir, filename)
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("content")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target content")
+    # Create files, plus a regular file with the temporary link's name
+    source_file, _ = make_pair("test.txt")
+    tmp_file = make_file(source_file + ".relink.tmp")
 
     # Run the function
+    caplog.set_level(logging.INFO, logger=relink.logger.name)
     relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
 
-    # Verify
-    assert os.path.islink(source_file)
-    assert os.readlink(source_file) == target_file
+    # Verify neither file was touched
+    assert os.path.isfile(source_file) and not os.path.islink(source_file)
+    assert os.path.isfile(tmp_file) and not os.path.islink(tmp_file)
+    assert logged(MSG_ERROR_SYMLINK)
 
 
-def test_error_deleting_file(temp_dirs, caplog):
-    """Test error message when file deletion fails."""
+@pytest.mark.parametrize(
+    "funcs_to_fail, expected_errors",
+    [
+        (["os.symlink"], [MSG_ERROR_SYMLINK]),
+        (["os.replace"], [MSG_ERROR_REPLACING]),
+        (["os.replace", "os.remove"], [MSG_ERROR_REPLACING, MSG_ERROR_REMOVING_TMP]),
+    ],
+    ids=["symlink", "replace", "replace_and_cleanup"],
+)
+def test_error_replacing_file(temp_dirs, make_pair, caplog, funcs_to_fail, expected_errors):
+    """Test error messages when one or more of the filesystem operations fail."""
     source_dir, target_dir = temp_dirs
 
     # Create files
-    source_file = os.path.join(source_dir, "test.txt")
-    target_file = os.path.join(target_dir, "test.txt")
+    source_file, _ = make_pair("test.txt")
+    tmp_link_name = source_file + ".relink.tmp"
 
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target")
+    # Mock the operations to raise an error
+    with ExitStack() as stack:
+        for func in funcs_to_fail:
+            stack.enter_context(patch(func, side_effect=OSError(f"Simulated {func} error")))
 
-    # Mock os.rename to raise an error
-    def mock_rename(src, dst):
-        raise OSError("Simulated rename error")
-
-    with patch("os.rename", side_effect=mock_rename):
         # Run the function
-        with caplog.at_level(logging.INFO):
-            relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
+        caplog.set_level(logging.INFO, logger=relink.logger.name)
+        relink.replace_one_file_with_symlink(source_dir, target_dir, source_file)
 
-        # Check error message
-        assert "Error deleting file" in caplog.text
-        assert source_file in caplog.text
+    # Check error messages, in order, so the original error comes before any cleanup error
+    messages = [r.getMessage() for r in caplog.records if r.levelno == logging.ERROR]
+    assert len(messages) == len(expected_errors)
+    for message, expected_error, func in zip(messages, expected_errors, funcs_to_fail):
+        assert expected_error in message
+        assert f"Simulated {func} error" in message
+    assert source_file in messages[0]
+
+    # The original file should be untouched. A temporary link is only left behind (and reported)
+    # if removing it failed.
+    assert os.path.isfile(source_file) and not os.path.islink(source_file)
+    if "os.remove" in funcs_to_fail:
+        assert tmp_link_name in messages[-1]
+        assert sorted(os.listdir(source_dir)) == ["test.txt", "test.txt.relink.tmp"]
+    else:
+        assert os.listdir(source_dir) == ["test.txt"]
@@ -2,25 +2,22 @@
 Tests of relink.py --timing option
 """
 
-import os
-import sys
 import logging
 from unittest.mock import patch
 
 import pytest
 
-# Add parent directory to path to import relink module
-sys.path.insert(
-    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-)
-# pylint: disable=wrong-import-position
-import relink  # noqa: E402
+import relink
+
+from . import MSG_EXECUTION_TIME, MSG_SEARCHING
 
 
 @pytest.mark.parametrize(
     "use_timing, should_log_timing", [(True, True), (False, False)]
 )
-def test_timing_logging(tmp_path, caplog, use_timing, should_log_timing):
+def test_timing_logging(
+    tmp_path, caplog, logged, monkeypatch, use_timing, should_log_timing
+):
     """Test that timing message is logged only when --timing flag is used."""
     # Create real directories
     source_dir = tmp_path / "source"
@@ -28,11 +25,8 @@ def test_timing_logging(tmp_path, caplog, use_timing, should_log_timing):
     source_dir.mkdir()
     target_dir.mkdir()
 
-    # Create a file
-    source_file = source_dir / "test_file.txt"
-    target_file = target_dir / "test_file.txt"
-    source_file.write_text("source")
-    target_file.write_text("target")
+    # Only the timing logic is being tested here, so skip the actual work
+    monkeypatch.setattr(relink, "replace_files_with_symlinks", lambda *a, **k: None)
 
     # Build argv with or without --timing flag
     test_argv = [
@@ -53,13 +47,22 @@ def test_timing_logging(tmp_path, caplog, use_timing, should_log_timing):
 
     # Verify timing message presence based on flag
     if should_log_timing:
-        assert "Execution time:" in caplog.text
-        assert "seconds" in caplog.text
+        assert logged(MSG_EXECUTION_TIME)
+        assert logged("seconds")
     else:
-        assert "Execution time:" not in caplog.text
+        assert not logged(MSG_EXECUTION_TIME)
+
+
+def test_log_execution_time(caplog, logged):
+    """Test that the elapsed time is measured from start_time and logged in seconds."""
+    with patch("relink.time.perf_counter", return_value=11.5):
+        with caplog.at_level(logging.INFO):
+            relink.log_execution_time(10.0)
+
+    assert logged(f"{MSG_EXECUTION_TIME} 1.50 seconds")
 
 
-def test_timing_shows_in_quiet_mode(tmp_path, caplog):
+def test_timing_shows_in_quiet_mode(tmp_path, caplog, logged):
     """Test that timing message is shown even when --quiet flag is used."""
     # Create real directories
     source_dir = tmp_path / "source"
@@ -91,7 +94,7 @@ def test_timing_shows_in_quiet_mode(tmp_path, caplog):
             relink.main()
 
     # Verify timing message appears even in quiet mode
-    assert "Execution time:" in caplog.text
-    assert "seconds" in caplog.text
+    assert logged(MSG_EXECUTION_TIME)
+    assert logged("seconds")
     # Verify that INFO messages are suppressed
-    assert "Searching for files owned by" not in caplog.text
+    assert not logged(MSG_SEARCHING)
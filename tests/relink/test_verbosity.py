@@ -3,32 +3,34 @@ Tests of verbosity levels in relink.py script.
 """
 
 import os
-import sys
 import tempfile
 import logging
 from unittest.mock import patch
 
-# Add parent directory to path to import relink module
-sys.path.insert(
-    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import relink
+
+from . import (
+    MSG_CREATED,
+    MSG_DELETED,
+    MSG_ERROR_REPLACING,
+    MSG_ERROR_SYMLINK,
+    MSG_FOUND_OWNED,
+    MSG_NOT_FOUND,
+    MSG_SEARCHING,
+    MSG_SKIPPING_SYMLINK,
+    MSG_TARGET_MISSING,
+    MSG_USER_NOT_FOUND,
+    make_file,
 )
-# pylint: disable=wrong-import-position
-import relink  # noqa: E402
 
 
-def test_quiet_mode_suppresses_info_messages(temp_dirs, caplog):
+def test_quiet_mode_suppresses_info_messages(temp_dirs, current_user, make_pair, caplog, logged):
     """Test that quiet mode suppresses INFO level messages."""
     source_dir, target_dir = temp_dirs
-    username = os.environ["USER"]
+    username = current_user
 
     # Create files
-    source_file = os.path.join(source_dir, "test_file.txt")
-    target_file = os.path.join(target_dir, "test_file.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target")
+    make_pair("test_file.txt")
 
     # Create a symlink to test "Skipping symlink" message
     source_link = os.path.join(source_dir, "existing_link.txt")
@@ -42,22 +44,21 @@ def test_quiet_mode_suppresses_info_messages(temp_dirs, caplog):
         )
 
     # Verify INFO messages are NOT in the log
-    assert "Searching for files owned by" not in caplog.text
-    assert "Skipping symlink:" not in caplog.text
-    assert "Found owned file:" not in caplog.text
-    assert "Deleted original file:" not in caplog.text
-    assert "Created symbolic link:" not in caplog.text
+    assert not logged(MSG_SEARCHING)
+    assert not logged(MSG_SKIPPING_SYMLINK)
+    assert not logged(MSG_FOUND_OWNED)
+    assert not logged(MSG_DELETED)
+    assert not logged(MSG_CREATED)
 
 
-def test_quiet_mode_shows_warnings(temp_dirs, caplog):
+def test_quiet_mode_shows_warnings(temp_dirs, current_user, caplog, logged):
     """Test that quiet mode still shows WARNING level messages."""
     source_dir, target_dir = temp_dirs
-    username = os.environ["USER"]
+    username = current_user
 
     # Create only source file (no corresponding target) to trigger warning
     source_file = os.path.join(source_dir, "orphan.txt")
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("orphan content")
+    make_file(source_file, b"orphan content")
 
     # Run the function with WARNING level (quiet mode)
     with caplog.at_level(logging.WARNING):
@@ -66,57 +67,46 @@ def test_quiet_mode_shows_warnings(temp_dirs, caplog):
         )
 
     # Verify WARNING message IS in the log
-    assert "Warning: Corresponding file" in caplog.text
-    assert "not found" in caplog.text
+    assert logged(MSG_TARGET_MISSING)
+    assert logged(MSG_NOT_FOUND)
 
 
-def test_quiet_mode_shows_errors(temp_dirs, caplog):
+def test_quiet_mode_shows_errors(
+    temp_dirs, current_user, make_pair, known_missing_user, caplog, logged
+):
     """Test that quiet mode still shows ERROR level messages."""
     source_dir, target_dir = temp_dirs
-    username = os.environ["USER"]
+    username = current_user
 
     # Test 1: Invalid username error
-    invalid_username = "nonexistent_user_12345"
     with caplog.at_level(logging.WARNING):
         relink.replace_files_with_symlinks(
-            source_dir, target_dir, invalid_username, inputdata_root=source_dir
+            source_dir, target_dir, known_missing_user, inputdata_root=source_dir
         )
-    assert "Error: User" in caplog.text
-    assert "not found" in caplog.text
+    assert logged(MSG_USER_NOT_FOUND)
+    assert logged(MSG_NOT_FOUND)
 
     # Clear the log for next test
     caplog.clear()
 
-    # Test 2: Error deleting file
-    source_file = os.path.join(source_dir, "test.txt")
-    target_file = os.path.join(target_dir, "test.txt")
-
-    with open(source_file, "w", encoding="utf-8") as f:
-        f.write("source")
-    with open(target_file, "w", encoding="utf-8") as f:
-        f.write("target")
+    # Test 2: Error replacing file with symlink
+    make_pair("test.txt")
 
-    def mock_rename(src, dst):
-        raise OSError("Simulated rename error")
+    def mock_replace(src, dst):
+        raise OSError("Simulated replace error")
 
-    with patch("os.rename", side_effect=mock_rename):
+    with patch("os.replace", side_effect=mock_replace):
         with caplog.at_level(logging.WARNING):
             relink.replace_files_with_symlinks(
                 source_dir, target_dir, username, inputdata_root=source_dir
             )
-        assert "Error deleting file" in caplog.text
+        assert logged(MSG_ERROR_REPLACING)
 
     # Clear the log for next test
     caplog.clear()
 
     # Test 3: Error creating symlink
-    source_file2 = os.path.join(source_dir, "test2.txt")
-    target_file2 = os.path.join(target_dir, "test2.txt")
-
-    with open(source_file2, "w", encoding="utf-8") as f:
-        f.write("source2")
-    with open(target_file2, "w", encoding="utf-8") as f:
-        f.write("target2")
+    make_pair("test2.txt")
 
     def mock_symlink(src, dst):
         raise OSError("Simulated symlink error")
@@ -126,4 +116,4 @@ def test_quiet_mode_shows_errors(temp_dirs, caplog):
             relink.replace_files_with_symlinks(
                 source_dir, target_dir, username, inputdata_root=source_dir
             )
-        assert "Error creating symlink" in caplog.text
+        assert logged(MSG_ERROR_SYMLINK)